@@ -15,9 +15,10 @@ import pandas as pd
 from datetime import datetime, timedelta
 from typing import Dict, List, Tuple, Optional
 import logging
-from sqlalchemy import text
+from sqlalchemy import text, insert, table, column
 import json
 from dataclasses import dataclass
+from contextlib import nullcontext
 from enum import Enum
 
 # Import database manager
@@ -26,9 +27,60 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config.database import DatabaseManager
 
+try:
+    from numba import njit  # Optional: compiled kernel for large batch scoring
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Lightweight table construct for Core INSERTs into the risk score history
+RISK_SCORES_TABLE = table(
+    'environmental_risk_scores',
+    column('location_id'),
+    column('location_type'),
+    column('risk_score'),
+    column('risk_category'),
+    column('contributing_factors'),
+    column('calculation_date')
+)
+
+
+def _risk_curve(conc_ratio: np.ndarray, health_weight: np.ndarray) -> np.ndarray:
+    """
+    Weighted pollutant risk for concentration/reference ratios, capped at 100:
+    linear below the reference, exponential approach to 100 above it
+    """
+    base_risk = np.where(
+        conc_ratio > 1.0,
+        50 + (50 * (1 - np.exp(-2 * (conc_ratio - 1)))),
+        50 * conc_ratio
+    )
+    return np.minimum(base_risk * health_weight, 100.0)
+
+
+if HAS_NUMBA:
+    # Single fused loop instead of the temporaries np.where builds; cache=True keeps
+    # the compiled kernel in __pycache__ so only the first run pays for the JIT.
+    # fastmath stays off because NULL measurements arrive as NaN.
+    @njit(cache=True)
+    def _risk_curve_compiled(conc_ratio, health_weight):
+        out = np.empty_like(conc_ratio)
+        for i in range(conc_ratio.shape[0]):
+            ratio = conc_ratio[i]
+            if ratio > 1.0:
+                base_risk = 50.0 + (50.0 * (1.0 - np.exp(-2.0 * (ratio - 1.0))))
+            else:
+                base_risk = 50.0 * ratio
+            out[i] = min(base_risk * health_weight[i], 100.0)
+        return out
+    
+    _risk_curve_kernel = _risk_curve_compiled
+else:
+    _risk_curve_kernel = _risk_curve
+
 class RiskLevel(Enum):
     """Environmental risk level categories"""
     LOW = "LOW"
@@ -75,8 +127,9 @@ class EnvironmentalRiskScoring:
     Core environmental risk scoring engine for Washington State
     """
     
-    def __init__(self):
-        self.db = DatabaseManager()
+    def __init__(self, db: Optional[DatabaseManager] = None):
+        # Callers running many analyses can share one DatabaseManager (and its pool)
+        self.db = db or DatabaseManager()
         self.params = RiskParameters()
         
     def calculate_pollutant_risk_score(self, 
@@ -102,22 +155,12 @@ class EnvironmentalRiskScoring:
             logger.warning(f"No reference concentration for: {pollutant}")
             return 0.0
         
-        ref_data = self.params.REFERENCE_CONCENTRATIONS[pollutant]
         health_weight = self.params.HEALTH_WEIGHTS[pollutant]
         
-        # Get reference concentration for averaging period
-        if averaging_period in ref_data:
-            reference_conc = ref_data[averaging_period]
-        elif 'annual' in ref_data:
-            reference_conc = ref_data['annual']
-        else:
-            # Use the first available reference (skip 'unit' key)
-            ref_values = [v for k, v in ref_data.items() if k != 'unit' and isinstance(v, (int, float))]
-            if ref_values:
-                reference_conc = ref_values[0]
-            else:
-                logger.warning(f"No valid reference concentration for {pollutant}")
-                return 0.0
+        reference_conc = self._reference_concentration(pollutant, averaging_period)
+        if reference_conc is None:
+            logger.warning(f"No valid reference concentration for {pollutant}")
+            return 0.0
         
         # Calculate concentration ratio
         conc_ratio = concentration / reference_conc
@@ -253,6 +296,198 @@ class EnvironmentalRiskScoring:
                 'error': str(e)
             }
     
+    def _reference_concentration(self, pollutant: str, averaging_period: str) -> Optional[float]:
+        """Reference concentration for an averaging period, falling back to annual then any"""
+        ref_data = self.params.REFERENCE_CONCENTRATIONS.get(pollutant, {})
+        
+        if averaging_period in ref_data:
+            return ref_data[averaging_period]
+        if 'annual' in ref_data:
+            return ref_data['annual']
+        
+        # Use the first available reference (skip 'unit' key)
+        ref_values = [v for k, v in ref_data.items() if k != 'unit' and isinstance(v, (int, float))]
+        return ref_values[0] if ref_values else None
+    
+    def calculate_pollutant_risk_score_batch(self, 
+                                           pollutants, 
+                                           concentrations, 
+                                           averaging_period: str = '24hour') -> np.ndarray:
+        """
+        Vectorized calculate_pollutant_risk_score over aligned arrays
+        
+        Args:
+            pollutants: Pollutant names, one per concentration
+            concentrations: Measured concentrations
+            averaging_period: Averaging period applied to every value
+            
+        Returns:
+            Array of risk scores (0-100 scale); unknown pollutants score 0
+        """
+        # Look up reference and weight once per distinct pollutant, then broadcast
+        names, inverse = np.unique(np.asarray(pollutants, dtype=object), return_inverse=True)
+        reference_concs = [
+            self._reference_concentration(name, averaging_period) if name in self.params.HEALTH_WEIGHTS else None
+            for name in names
+        ]
+        known = np.array([ref is not None for ref in reference_concs], dtype=bool)[inverse]
+        reference_conc = np.array([ref or 1.0 for ref in reference_concs], dtype=float)[inverse]
+        health_weight = np.array([self.params.HEALTH_WEIGHTS.get(name, 0.0) for name in names], dtype=float)[inverse]
+        
+        conc_ratio = np.asarray(concentrations, dtype=float) / reference_conc
+        
+        # Same piecewise curve as the scalar scorer
+        return np.where(known, _risk_curve_kernel(conc_ratio, health_weight), 0.0)
+    
+    def _risk_levels(self, risk_scores: np.ndarray) -> List[str]:
+        """Vectorized _get_risk_level, using the lower bound of each threshold band"""
+        levels = list(self.params.RISK_THRESHOLDS)
+        lower_bounds = np.array([self.params.RISK_THRESHOLDS[level][0] for level in levels])
+        level_idx = np.searchsorted(lower_bounds, risk_scores, side='right') - 1
+        return [levels[i].value for i in level_idx.clip(0)]
+    
+    def _score_station_measurements(self, measurements: pd.DataFrame, keys: List[str]) -> pd.DataFrame:
+        """
+        Composite station risk from raw (keys..., parameter, value) measurement rows,
+        matching calculate_station_risk_score for each station
+        """
+        # Convert Decimal to float for calculations
+        measurements['value'] = measurements['value'].astype(float)
+        
+        # 95th percentile per station/parameter (accounts for peak exposures)
+        # Built-in quantile/count run vectorised instead of calling back into Python per group
+        grouped = measurements.groupby(keys + ['parameter'])['value']
+        components = pd.DataFrame({
+            'risk_concentration': grouped.quantile(0.95),
+            'sample_count': grouped.count()
+        }).reset_index()
+        components['risk_score'] = self.calculate_pollutant_risk_score_batch(
+            components['parameter'].to_numpy(), components['risk_concentration'].to_numpy()
+        )
+        
+        # Pollutants without a health weight do not contribute to the composite
+        components['weight'] = components['parameter'].map(self.params.HEALTH_WEIGHTS).fillna(0.0)
+        components['weighted'] = components['weight'] > 0
+        components['weighted_risk'] = components['risk_score'] * components['weight']
+        components['sample_count'] = components['sample_count'].where(components['weighted'], 0)
+        
+        stations = components.groupby(keys).agg(
+            weighted_risk=('weighted_risk', 'sum'),
+            weight=('weight', 'sum'),
+            parameter_count=('weighted', 'sum'),
+            sample_count=('sample_count', 'sum')
+        ).reset_index()
+        
+        weighted_risk = stations['weighted_risk'].to_numpy()
+        weight = stations['weight'].to_numpy()
+        composite_risk = np.divide(weighted_risk, weight, out=np.zeros_like(weighted_risk), where=weight > 0)
+        
+        stations['risk_score'] = composite_risk.round(2)
+        stations['risk_level'] = self._risk_levels(composite_risk)
+        stations['data_availability'] = np.where(stations['parameter_count'] >= 2, 'GOOD', 'LIMITED')
+        
+        return stations
+    
+    def calculate_station_risk_scores(self, 
+                                    date_range: Tuple[datetime, datetime] = None) -> pd.DataFrame:
+        """
+        Calculate risk scores for every active air quality station in one pass
+        
+        Batch equivalent of calculate_station_risk_score: one query loads all
+        measurements and scoring runs over per-station/parameter groups
+        
+        Args:
+            date_range: Date range for analysis (default: last 30 days)
+            
+        Returns:
+            DataFrame with one row per station that has valid measurements
+        """
+        if date_range is None:
+            end_date = datetime.now()
+            start_date = end_date - timedelta(days=30)
+            date_range = (start_date, end_date)
+        
+        query = text("""
+            SELECT m.station_id, m.parameter, m.value
+            FROM environmental_measurements m
+            JOIN monitoring_stations s ON s.station_id = m.station_id
+            WHERE s.type = 'air_quality' AND s.active = true
+            AND m.measurement_date BETWEEN :start_date AND :end_date
+            AND m.quality_flag = 'VALID'
+        """)
+        
+        with self.db.get_connection() as conn:
+            measurements = pd.read_sql(query, conn, params={
+                'start_date': date_range[0],
+                'end_date': date_range[1]
+            })
+        
+        columns = ['station_id', 'risk_score', 'risk_level', 'parameter_count', 'sample_count', 'data_availability']
+        if measurements.empty:
+            return pd.DataFrame(columns=columns)
+        
+        return self._score_station_measurements(measurements, ['station_id'])[columns]
+    
+    def calculate_county_risk_scores(self, 
+                                   date_range: Tuple[datetime, datetime] = None) -> pd.DataFrame:
+        """
+        Calculate risk scores for every county with active air quality stations in one pass
+        
+        Batch equivalent of calculate_county_risk_score: the station-to-county
+        assignment and the measurements come back from a single query
+        
+        Args:
+            date_range: Date range for analysis (default: last 30 days)
+            
+        Returns:
+            DataFrame with one row per county that has stations with valid measurements
+        """
+        if date_range is None:
+            end_date = datetime.now()
+            start_date = end_date - timedelta(days=30)
+            date_range = (start_date, end_date)
+        
+        # MATERIALIZED evaluates the point-in-polygon join once, ahead of the measurement join
+        query = text("""
+            WITH station_counties AS MATERIALIZED (
+                SELECT s.station_id, b.name as county
+                FROM monitoring_stations s
+                JOIN administrative_boundaries b ON ST_Within(s.location, b.geometry)
+                WHERE b.type = 'county'
+                AND s.type = 'air_quality' AND s.active = true
+            )
+            SELECT sc.county, m.station_id, m.parameter, m.value
+            FROM station_counties sc
+            JOIN environmental_measurements m ON m.station_id = sc.station_id
+            WHERE m.measurement_date BETWEEN :start_date AND :end_date
+            AND m.quality_flag = 'VALID'
+        """)
+        
+        with self.db.get_connection() as conn:
+            measurements = pd.read_sql(query, conn, params={
+                'start_date': date_range[0],
+                'end_date': date_range[1]
+            })
+        
+        columns = ['county', 'risk_score', 'risk_level', 'station_count', 'data_availability']
+        if measurements.empty:
+            return pd.DataFrame(columns=columns)
+        
+        stations = self._score_station_measurements(measurements, ['county', 'station_id'])
+        
+        # County risk is the mean of its (rounded) station scores, as in the per-county path
+        counties = stations.groupby('county').agg(
+            county_risk=('risk_score', 'mean'),
+            station_count=('station_id', 'size')
+        ).reset_index()
+        county_risk = counties['county_risk'].to_numpy()
+        
+        counties['risk_score'] = county_risk.round(2)
+        counties['risk_level'] = self._risk_levels(county_risk)
+        counties['data_availability'] = np.where(counties['station_count'] >= 2, 'GOOD', 'LIMITED')
+        
+        return counties[columns]
+    
     def calculate_county_risk_score(self, county_name: str, 
                                   date_range: Tuple[datetime, datetime] = None) -> Dict:
         """
@@ -415,16 +650,23 @@ class EnvironmentalRiskScoring:
                 return level
         return RiskLevel.HAZARDOUS  # For scores >= 90
     
-    def save_risk_scores_to_db(self, risk_data: Dict, location_type: str = 'station'):
+    def save_risk_scores_to_db(self, risk_data, location_type: str = 'station', conn=None):
         """
         Save calculated risk scores to database for later analysis
         
         Args:
-            risk_data: Risk calculation results
+            risk_data: Risk calculation result, or a list of results saved in one batch
             location_type: 'station' or 'county'
+            conn: Optional open connection to write on; the caller then owns the
+                  transaction, nothing is committed here and failures are re-raised
         """
+        records = [risk_data] if isinstance(risk_data, dict) else list(risk_data)
+        if not records:
+            return
+        
+        owns_connection = conn is None
         try:
-            with self.db.get_connection() as conn:
+            with self.db.get_connection() if owns_connection else nullcontext(conn) as conn:
                 # Create table if it doesn't exist
                 create_table_query = text("""
                     CREATE TABLE IF NOT EXISTS environmental_risk_scores (
@@ -441,30 +683,35 @@ class EnvironmentalRiskScoring:
                 conn.execute(create_table_query)
                 
                 # Insert risk score
-                insert_query = text("""
-                    INSERT INTO environmental_risk_scores 
-                    (location_id, location_type, risk_score, risk_category, 
-                     contributing_factors, calculation_date)
-                    VALUES (:location_id, :location_type, :risk_score, :risk_category,
-                           :contributing_factors, :calculation_date)
-                """)
-                
-                location_id = risk_data.get('station_id') or risk_data.get('county')
+                insert_query = insert(RISK_SCORES_TABLE)
                 
-                conn.execute(insert_query, {
-                    'location_id': location_id,
+                calculation_date = datetime.now().date()
+                rows = [{
+                    'location_id': record.get('station_id') or record.get('county'),
                     'location_type': location_type,
-                    'risk_score': float(risk_data['risk_score']),  # Convert numpy to native float
-                    'risk_category': risk_data['risk_level'],
-                    'contributing_factors': json.dumps(risk_data.get('components', {})),
-                    'calculation_date': datetime.now().date()
-                })
-                
-                conn.commit()
-                logger.info(f"✅ Saved risk score for {location_type}: {location_id}")
+                    'risk_score': float(record['risk_score']),  # Convert numpy to native float
+                    'risk_category': record['risk_level'],
+                    'contributing_factors': json.dumps(record.get('components', {})),
+                    'calculation_date': calculation_date
+                } for record in records]
+                
+                # A Core insert() with a parameter list goes through SQLAlchemy's
+                # insertmanyvalues path: multi-row INSERT ... VALUES statements of up
+                # to 1000 rows each instead of one statement per row
+                conn.execute(insert_query, rows)
+                
+                if owns_connection:
+                    conn.commit()
+                if len(rows) == 1:
+                    logger.info(f"✅ Saved risk score for {location_type}: {rows[0]['location_id']}")
+                else:
+                    logger.info(f"✅ Saved {len(rows)} {location_type} risk scores")
                 
         except Exception as e:
             logger.error(f"Failed to save risk score: {e}")
+            if not owns_connection:
+                # The caller's transaction is now aborted; it has to see why
+                raise
 
 def test_risk_calculation():
     """
@@ -546,9 +793,9 @@ def demo_risk_analysis():
                     logger.info(f"   Components:")
                     for param, details in risk_result['components'].items():
                         logger.info(f"     - {param}: {details['risk_score']:.1f} (avg: {details['avg_concentration']})")
-                
-                # Save to database
-                risk_engine.save_risk_scores_to_db(risk_result, 'station')
+            
+            # Save to database
+            risk_engine.save_risk_scores_to_db(station_results, 'station')
             
             # Calculate county-level risks
             logger.info(f"\n🏘️ County-Level Risk Analysis:")
@@ -575,9 +822,9 @@ def demo_risk_analysis():
                 logger.info(f"   County Risk: {county_risk['risk_score']}/100")
                 logger.info(f"   Risk Level: {county_risk['risk_level']}")
                 logger.info(f"   Stations: {county_risk['station_count']}")
-                
-                # Save to database
-                risk_engine.save_risk_scores_to_db(county_risk, 'county')
+            
+            # Save to database
+            risk_engine.save_risk_scores_to_db(county_results, 'county')
             
             # Generate statewide summary
             logger.info(f"\n🗺️ Statewide Risk Summary:")
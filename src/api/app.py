@@ -7,6 +7,7 @@ Provides RESTful endpoints for spatial environmental data
 from flask import Flask, request, jsonify
 from flask_restful import Api, Resource
 from flask_cors import CORS
+from flask_compress import Compress
 import json
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
@@ -31,6 +32,9 @@ app.config['SECRET_KEY'] = 'wa-environmental-platform-dev-key'
 # Enable CORS for frontend integration
 CORS(app, origins=["http://localhost:3000", "http://localhost:5173"])
 
+# Gzip responses for clients that accept it (GeoJSON payloads compress well)
+Compress(app)
+
 # Initialize Flask-RESTful
 api = Api(app)
 
@@ -10,10 +10,11 @@ import pandas as pd
 load_dotenv()
 
 class DatabaseManager:
-    def __init__(self):
+    def __init__(self, pool_size=5, max_overflow=10):
     # Use Unix socket connection (bypass .env file for now)
+        # Pool defaults match SQLAlchemy's; concurrent callers can size it up
         self.db_url = 'postgresql:///wa_environmental_platform'
-        self.engine = create_engine(self.db_url)
+        self.engine = create_engine(self.db_url, pool_size=pool_size, max_overflow=max_overflow)
         self.Session = sessionmaker(bind=self.engine)
     
     def get_connection(self):
@@ -11,17 +11,29 @@ FIXES APPLIED:
 """
 
 import os
+import io
 import time
+import zipfile
+from urllib.parse import urlencode
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import pandas as pd
 import geopandas as gpd
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
 import logging
 import json
-from sqlalchemy import text
+from sqlalchemy import text, func, bindparam, table, column
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 import numpy as np
 
+try:
+    import orjson  # Optional: faster metadata serialization
+except ImportError:
+    orjson = None
+
 # Import our database manager
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -31,12 +43,85 @@ from config.database import DatabaseManager
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+
+def dumps_json(data: Dict) -> str:
+    """Serialize metadata to a JSON string, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(data).decode()
+    return json.dumps(data)
+
+
+class TokenBucket:
+    """
+    Simple token bucket rate limiter for WQP requests
+    Only sleeps when the bucket is empty; capacity can be lowered from server headers
+    """
+    
+    def __init__(self, capacity: int = 10, refill_per_sec: float = 5.0):
+        self.capacity = capacity
+        self.refill_rate = refill_per_sec
+        self.tokens = float(capacity)
+        self.last_refill = time.monotonic()
+    
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.refill_rate)
+        self.last_refill = now
+    
+    def acquire(self):
+        """Take one token, sleeping only if none are available"""
+        self._refill()
+        if self.tokens < 1:
+            time.sleep((1 - self.tokens) / self.refill_rate)
+            self._refill()
+        self.tokens -= 1
+    
+    def update_from_headers(self, headers):
+        """Clamp available tokens to the server-advertised remaining quota, if any"""
+        remaining = headers.get('X-RateLimit-Remaining')
+        if remaining is not None:
+            try:
+                self.tokens = min(self.tokens, float(remaining))
+            except ValueError:
+                pass
+
+
 class WaterQualityConnectorFixed:
     """
     FIXED Water Quality Portal integration for Washington State
     Uses correct API parameters and simplified approach
     """
     
+    # Insert statements are built once and reused for every batch. They are Core
+    # insert() constructs (not text()) so a parameter list is sent through
+    # SQLAlchemy's insertmanyvalues path as multi-row INSERTs, and RETURNING
+    # reports exactly which rows were new
+    _STATIONS_TABLE = table(
+        'monitoring_stations',
+        column('station_id'), column('name'), column('type'), column('agency'),
+        column('location'), column('active'), column('metadata')
+    )
+    _MEASUREMENTS_TABLE = table(
+        'environmental_measurements',
+        column('station_id'), column('parameter'), column('value'), column('unit'),
+        column('measurement_date'), column('data_source'), column('quality_flag')
+    )
+    
+    # station_id is UNIQUE, so existing stations are skipped by the insert itself
+    _STATION_INSERT = (
+        pg_insert(_STATIONS_TABLE)
+        .values(location=func.ST_SetSRID(func.ST_MakePoint(bindparam('longitude'), bindparam('latitude')), 4326))
+        .on_conflict_do_nothing(index_elements=['station_id'])
+        .returning(_STATIONS_TABLE.c.station_id)
+    )
+    
+    # Simplified duplicate check
+    _MEASUREMENT_INSERT = (
+        pg_insert(_MEASUREMENTS_TABLE)
+        .on_conflict_do_nothing()
+        .returning(_MEASUREMENTS_TABLE.c.station_id)
+    )
+    
     def __init__(self):
         self.wqp_base_url = "https://www.waterqualitydata.us"
         self.db = DatabaseManager()
@@ -52,10 +137,32 @@ class WaterQualityConnectorFixed:
             "Turbidity"
         ]
         
-        # Rate limiting for API calls
-        self.rate_limit_delay = 3  # Increased delay to be conservative
+        # Rate limiting for API calls (token bucket, backoff only on HTTP 429)
+        self.limiter = TokenBucket(capacity=10, refill_per_sec=5)
+        self.max_rate_limit_retries = 5
         
-    def _make_wqp_request(self, endpoint: str, params: Dict) -> Optional[requests.Response]:
+        # Query strings longer than this are sent as POST bodies instead
+        self.max_query_length = 2000
+        
+        # Shared HTTP session with keep-alive pooling and retries on WQP 5xx errors;
+        # WQP responses are requested zipped (zip=yes). HTTP 429 is left to the
+        # rate-limit loop in _make_wqp_request, so urllib3 must not retry it on Retry-After
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=8,
+            pool_maxsize=16,
+            max_retries=Retry(
+                total=3, backoff_factor=1, status_forcelist=[500, 502, 503, 504],
+                respect_retry_after_header=False
+            )
+        )
+        self.session.mount('https://', adapter)
+        self.session.headers.update({
+            'Accept-Encoding': 'gzip',
+            'User-Agent': 'wa-env-platform/1.0'
+        })
+        
+    def _make_wqp_request(self, endpoint: str, params: Dict, method: str = 'get') -> Optional[requests.Response]:
         """Make request to Water Quality Portal with enhanced error handling"""
         url = f"{self.wqp_base_url}{endpoint}"
         
@@ -68,10 +175,27 @@ class WaterQualityConnectorFixed:
             logger.info(f"Making WQP request: {endpoint}")
             logger.info(f"Parameters: {params}")
             
-            response = requests.get(url, params=params, timeout=120)  # Increased timeout
-            
-            # Rate limiting
-            time.sleep(self.rate_limit_delay)
+            for attempt in range(self.max_rate_limit_retries):
+                self.limiter.acquire()
+                if method == 'post':
+                    response = self.session.post(url, data=params, timeout=120)
+                else:
+                    response = self.session.get(url, params=params, timeout=120)  # Increased timeout
+                self.limiter.update_from_headers(response.headers)
+                
+                if response.status_code != 429:
+                    break
+                
+                # Out of retries: don't sleep just to give up afterwards
+                if attempt == self.max_rate_limit_retries - 1:
+                    logger.error(f"❌ WQP rate limit still hit after {self.max_rate_limit_retries} attempts")
+                    break
+                
+                # Rate limited: honour Retry-After, otherwise back off exponentially
+                retry_after = response.headers.get('Retry-After')
+                delay = float(retry_after) if retry_after and retry_after.isdigit() else 2 ** attempt
+                logger.warning(f"⚠️ WQP rate limit hit, retrying in {delay}s")
+                time.sleep(delay)
             
             logger.info(f"Response status: {response.status_code}")
             
@@ -79,8 +203,8 @@ class WaterQualityConnectorFixed:
                 content_length = len(response.content)
                 logger.info(f"✅ WQP request successful: {content_length} bytes")
                 
-                # Log first part of response for debugging
-                if hasattr(response, 'text') and response.text:
+                # Log first part of response for debugging (zipped payloads are binary)
+                if response.content and not response.content.startswith(b'PK'):
                     logger.info(f"Response preview: {response.text[:200]}...")
                 
                 return response
@@ -93,6 +217,21 @@ class WaterQualityConnectorFixed:
             logger.error(f"❌ WQP Request failed: {e}")
             return None
     
+    def _read_wqp_csv(self, response: requests.Response, nrows: Optional[int] = None) -> pd.DataFrame:
+        """
+        Parse a WQP CSV response, unpacking it first if it was returned zipped
+        When nrows is given, parsing stops after that many rows
+        """
+        buffer = io.BytesIO(response.content)
+        
+        if zipfile.is_zipfile(buffer):
+            with zipfile.ZipFile(buffer) as archive:
+                with archive.open(archive.namelist()[0]) as csv_file:
+                    return pd.read_csv(csv_file, nrows=nrows)
+        
+        buffer.seek(0)
+        return pd.read_csv(buffer, nrows=nrows)
+    
     def test_wqp_connection(self) -> bool:
         """Test basic WQP connectivity with a simple request"""
         logger.info("🧪 Testing WQP connection with simple request...")
@@ -102,7 +241,7 @@ class WaterQualityConnectorFixed:
         # Simple test: get one station from a known county
         params = {
             'mimeType': 'csv',
-            'zip': 'no',
+            'zip': 'yes',
             'statecode': self.wa_state_code,
             'countycode': 'US:53:033',  # King County
             'sorted': 'yes'
@@ -137,74 +276,94 @@ class WaterQualityConnectorFixed:
         
         all_stations = []
         
-        for county_code, county_name in wa_counties.items():
-            logger.info(f"📍 Fetching stations for {county_name} ({county_code})")
-            
-            endpoint = "/data/Station/search"
+        # Downloads stay sequential (rate limited); each county's CSV is parsed on a
+        # worker thread so parsing overlaps with the next county's download
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            parse_futures = {}
             
-            params = {
-                'mimeType': 'csv',
-                'zip': 'no',
-                'statecode': self.wa_state_code,
-                'countycode': county_code,
-                'providers': 'NWIS',  # Start with USGS only for reliability
-                'sorted': 'yes'
-            }
-            
-            response = self._make_wqp_request(endpoint, params)
+            for county_code, county_name in wa_counties.items():
+                logger.info(f"📍 Fetching stations for {county_name} ({county_code})")
+                
+                endpoint = "/data/Station/search"
+                
+                params = {
+                    'mimeType': 'csv',
+                    'zip': 'yes',
+                    'statecode': self.wa_state_code,
+                    'countycode': county_code,
+                    'providers': 'NWIS',  # Start with USGS only for reliability
+                    'sorted': 'yes'
+                }
+                
+                response = self._make_wqp_request(endpoint, params)
+                
+                if response and response.status_code == 200:
+                    parse_futures[county_name] = executor.submit(
+                        self._parse_stations_csv, response, county_name, county_code, max_per_county
+                    )
+                else:
+                    logger.warning(f"⚠️ No data returned for {county_name}")
             
-            if response and response.status_code == 200:
+            # Collect in county order so the station list stays deterministic
+            for county_name, future in parse_futures.items():
                 try:
-                    # Parse CSV response
-                    from io import StringIO
-                    df = pd.read_csv(StringIO(response.text))
-                    
-                    logger.info(f"📊 Found {len(df)} stations in {county_name}")
-                    
-                    # Process stations (limit per county to manage data volume)
-                    county_stations = []
-                    for _, row in df.head(max_per_county).iterrows():
-                        # Skip stations without coordinates
-                        if pd.isna(row.get('LatitudeMeasure')) or pd.isna(row.get('LongitudeMeasure')):
-                            continue
-                        
-                        station_data = {
-                            'station_id': f"WQ-{row.get('MonitoringLocationIdentifier', 'UNKNOWN')}",
-                            'original_id': str(row.get('MonitoringLocationIdentifier', '')),
-                            'name': str(row.get('MonitoringLocationName', 'Unknown Water Station'))[:255],  # Truncate long names
-                            'type': 'water_quality',
-                            'agency': str(row.get('OrganizationIdentifier', 'Unknown'))[:100],
-                            'location': f"POINT({row['LongitudeMeasure']} {row['LatitudeMeasure']})",
-                            'active': True,
-                            'metadata': {
-                                'latitude': float(row['LatitudeMeasure']),
-                                'longitude': float(row['LongitudeMeasure']),
-                                'original_id': str(row.get('MonitoringLocationIdentifier', '')),
-                                'site_type': str(row.get('MonitoringLocationTypeName', 'Unknown'))[:100],
-                                'county': county_name,
-                                'county_code': county_code,
-                                'state': 'WA',
-                                'huc_code': str(row.get('HUCEightDigitCode', ''))[:20],
-                                'provider_name': str(row.get('ProviderName', ''))[:100],
-                                'organization_name': str(row.get('OrganizationFormalName', ''))[:255],
-                                'description': str(row.get('MonitoringLocationDescriptionText', ''))[:500],
-                                'water_body_name': str(row.get('ResolvedMonitoringLocationTypeName', ''))[:255]
-                            }
-                        }
-                        county_stations.append(station_data)
-                    
+                    county_stations = future.result()
                     all_stations.extend(county_stations)
                     logger.info(f"✅ Processed {len(county_stations)} valid stations from {county_name}")
                     
                 except Exception as e:
                     logger.error(f"❌ Failed to parse stations for {county_name}: {e}")
                     continue
-            else:
-                logger.warning(f"⚠️ No data returned for {county_name}")
         
         logger.info(f"🎯 Total water quality stations found: {len(all_stations)}")
         return all_stations
     
+    def _parse_stations_csv(self, response: requests.Response, county_name: str,
+                            county_code: str, max_per_county: int) -> List[Dict]:
+        """Parse one county's WQP Station CSV into station records"""
+        # Parse CSV response
+        df = self._read_wqp_csv(response)
+        
+        logger.info(f"📊 Found {len(df)} stations in {county_name}")
+        
+        # Process stations (limit per county to manage data volume); plain dict
+        # records are much cheaper to walk than iterrows() Series
+        rows = df.head(max_per_county).to_dict('records')
+        
+        # Skip stations without coordinates
+        return [
+            self._row_to_station(row, county_name, county_code)
+            for row in rows
+            if not (pd.isna(row.get('LatitudeMeasure')) or pd.isna(row.get('LongitudeMeasure')))
+        ]
+    
+    def _row_to_station(self, row: Dict, county_name: str, county_code: str) -> Dict:
+        """Build a station record from one WQP Station CSV row"""
+        return {
+            'station_id': f"WQ-{row.get('MonitoringLocationIdentifier', 'UNKNOWN')}",
+            'original_id': str(row.get('MonitoringLocationIdentifier', '')),
+            'name': str(row.get('MonitoringLocationName', 'Unknown Water Station'))[:255],  # Truncate long names
+            'type': 'water_quality',
+            'agency': str(row.get('OrganizationIdentifier', 'Unknown'))[:100],
+            'longitude': float(row['LongitudeMeasure']),
+            'latitude': float(row['LatitudeMeasure']),
+            'active': True,
+            'metadata': {
+                'latitude': float(row['LatitudeMeasure']),
+                'longitude': float(row['LongitudeMeasure']),
+                'original_id': str(row.get('MonitoringLocationIdentifier', '')),
+                'site_type': str(row.get('MonitoringLocationTypeName', 'Unknown'))[:100],
+                'county': county_name,
+                'county_code': county_code,
+                'state': 'WA',
+                'huc_code': str(row.get('HUCEightDigitCode', ''))[:20],
+                'provider_name': str(row.get('ProviderName', ''))[:100],
+                'organization_name': str(row.get('OrganizationFormalName', ''))[:255],
+                'description': str(row.get('MonitoringLocationDescriptionText', ''))[:500],
+                'water_body_name': str(row.get('ResolvedMonitoringLocationTypeName', ''))[:255]
+            }
+        }
+    
     def get_sample_measurements(self, station_original_id: str, max_results: int = 100) -> List[Dict]:
         """
         Get a sample of recent water quality measurements for a station
@@ -220,10 +379,12 @@ class WaterQualityConnectorFixed:
         
         params = {
             'mimeType': 'csv',
-            'zip': 'no',
+            'zip': 'yes',
             'siteid': station_original_id,
             'startDateLo': start_date.strftime('%m-%d-%Y'),
             'startDateHi': end_date.strftime('%m-%d-%Y'),
+            'characteristicName': ';'.join(self.key_parameters),  # Server-side parameter filter
+            'sampleMedia': 'Water',
             'sorted': 'yes'
         }
         
@@ -231,46 +392,14 @@ class WaterQualityConnectorFixed:
         
         if response and response.status_code == 200:
             try:
-                from io import StringIO
-                df = pd.read_csv(StringIO(response.text))
+                # Only the first max_results rows are used, so don't parse the rest
+                df = self._read_wqp_csv(response, nrows=max_results)
                 
-                logger.info(f"📊 Found {len(df)} raw measurements for {station_original_id}")
+                logger.info(f"📊 Read {len(df)} raw measurements for {station_original_id}")
                 
-                measurements = []
-                processed_count = 0
-                
-                for _, row in df.head(max_results).iterrows():
-                    # Skip rows without valid measurement values
-                    if pd.isna(row.get('ResultMeasureValue')):
-                        continue
-                    
-                    # Parse activity date
-                    activity_date = row.get('ActivityStartDate')
-                    if pd.isna(activity_date):
-                        continue
-                    
-                    try:
-                        measurement_date = pd.to_datetime(activity_date)
-                    except:
-                        continue
-                    
-                    # Get parameter info
-                    characteristic_name = str(row.get('CharacteristicName', 'Unknown'))
-                    
-                    # Create measurement record
-                    measurement = {
-                        'station_id': f"WQ-{station_original_id}",
-                        'parameter': characteristic_name[:100],  # Truncate long parameter names
-                        'value': float(row['ResultMeasureValue']),
-                        'unit': str(row.get('ResultMeasure.MeasureUnitCode', 'Unknown'))[:20],
-                        'measurement_date': measurement_date,
-                        'data_source': 'Water Quality Portal',
-                        'quality_flag': 'VALID',  # Simplified for now
-                    }
-                    measurements.append(measurement)
-                    processed_count += 1
+                measurements = self._parse_measurement_rows(df, station_original_id, max_results)
                 
-                logger.info(f"✅ Processed {processed_count} valid measurements for {station_original_id}")
+                logger.info(f"✅ Processed {len(measurements)} valid measurements for {station_original_id}")
                 return measurements
                 
             except Exception as e:
@@ -280,6 +409,118 @@ class WaterQualityConnectorFixed:
         logger.warning(f"⚠️ No measurements found for {station_original_id}")
         return []
     
+    def get_measurements_bulk(self, station_ids: List[str], max_results: int = 100) -> List[Dict]:
+        """
+        Get recent measurements for several stations in a single WQP request
+        WQP accepts multiple siteid values; rows are split back out per station
+        """
+        if not station_ids:
+            return []
+        
+        logger.info(f"🔍 Getting sample measurements for {len(station_ids)} stations in one request")
+        
+        endpoint = "/data/Result/search"
+        
+        # Get recent data (last year)
+        end_date = datetime.now()
+        start_date = end_date - timedelta(days=365)
+        
+        params = {
+            'mimeType': 'csv',
+            'zip': 'yes',
+            'siteid': ';'.join(station_ids),
+            'startDateLo': start_date.strftime('%m-%d-%Y'),
+            'startDateHi': end_date.strftime('%m-%d-%Y'),
+            'characteristicName': ';'.join(self.key_parameters),  # Server-side parameter filter
+            'sampleMedia': 'Water',
+            'sorted': 'yes'
+        }
+        
+        # Long site lists overflow the query string, so send them as a POST body instead
+        use_post = len(urlencode(params)) > self.max_query_length
+        response = self._make_wqp_request(endpoint, params, method='post' if use_post else 'get')
+        
+        if not (response and response.status_code == 200):
+            logger.warning(f"⚠️ No measurements found for {len(station_ids)} stations")
+            return []
+        
+        try:
+            df = self._read_wqp_csv(response)
+            logger.info(f"📊 Found {len(df)} raw measurements across {len(station_ids)} stations")
+            
+            all_measurements = []
+            for station_original_id, station_df in df.groupby('MonitoringLocationIdentifier', sort=False):
+                measurements = self._parse_measurement_rows(station_df, str(station_original_id), max_results)
+                logger.info(f"✅ Processed {len(measurements)} valid measurements for {station_original_id}")
+                all_measurements.extend(measurements)
+            
+            return all_measurements
+            
+        except Exception as e:
+            logger.error(f"❌ Failed to parse bulk measurements: {e}")
+            return []
+    
+    def _parse_measurement_rows(self, df: pd.DataFrame, station_original_id: str, max_results: int) -> List[Dict]:
+        """Convert WQP Result rows for one station into measurement records"""
+        rows = df.head(max_results).to_dict('records')
+        measurements = (self._row_to_measurement(row, station_original_id) for row in rows)
+        return [measurement for measurement in measurements if measurement is not None]
+    
+    def _row_to_measurement(self, row: Dict, station_original_id: str) -> Optional[Dict]:
+        """Build a measurement record from one WQP Result CSV row, or None if it is unusable"""
+        # Skip rows without valid measurement values
+        if pd.isna(row.get('ResultMeasureValue')):
+            return None
+        
+        # Parse activity date
+        activity_date = row.get('ActivityStartDate')
+        if pd.isna(activity_date):
+            return None
+        
+        try:
+            measurement_date = pd.to_datetime(activity_date)
+        except:
+            return None
+        
+        # Get parameter info
+        characteristic_name = str(row.get('CharacteristicName', 'Unknown'))
+        
+        # Create measurement record
+        return {
+            'station_id': f"WQ-{station_original_id}",
+            'parameter': characteristic_name[:100],  # Truncate long parameter names
+            'value': float(row['ResultMeasureValue']),
+            'unit': str(row.get('ResultMeasure.MeasureUnitCode', 'Unknown'))[:20],
+            'measurement_date': measurement_date,
+            'data_source': 'Water Quality Portal',
+            'quality_flag': 'VALID',  # Simplified for now
+        }
+    
+    def _insert_rows(self, statement, params_list: List[Dict], label: str) -> int:
+        """
+        Insert a batch with one executemany; if the batch fails, retry row by row in
+        savepoints so a bad row is logged and skipped instead of losing the batch
+        
+        Returns:
+            Number of rows actually inserted (counted from RETURNING)
+        """
+        with self.db.get_connection() as conn:
+            try:
+                with conn.begin():
+                    return len(conn.execute(statement, params_list).all())
+            except Exception as e:
+                logger.warning(f"⚠️ Batch {label} insert failed, retrying row by row: {e}")
+            
+            loaded_count = 0
+            with conn.begin():
+                for params in params_list:
+                    try:
+                        with conn.begin_nested():
+                            loaded_count += len(conn.execute(statement, params).all())
+                    except Exception as e:
+                        logger.error(f"Failed to load {label} {params.get('station_id', 'Unknown')}: {e}")
+            return loaded_count
+    
     def load_stations_to_database(self, stations: List[Dict]) -> bool:
         """Load water quality stations to database with better error handling"""
         if not stations:
@@ -289,47 +530,25 @@ class WaterQualityConnectorFixed:
         logger.info(f"💾 Loading {len(stations)} water quality stations to database...")
         
         try:
-            with self.db.get_connection() as conn:
-                loaded_count = 0
-                for station in stations:
-                    try:
-                        # Check if station already exists
-                        check_query = text("""
-                            SELECT COUNT(*) FROM monitoring_stations 
-                            WHERE station_id = :station_id
-                        """)
-                        
-                        result = conn.execute(check_query, {'station_id': station['station_id']})
-                        exists = result.fetchone()[0] > 0
-                        
-                        if not exists:
-                            insert_query = text("""
-                                INSERT INTO monitoring_stations 
-                                (station_id, name, type, agency, location, active, metadata)
-                                VALUES (:station_id, :name, :type, :agency, 
-                                       ST_GeomFromText(:location, 4326), :active, :metadata)
-                            """)
-                            
-                            conn.execute(insert_query, {
-                                'station_id': station['station_id'],
-                                'name': station['name'],
-                                'type': station['type'], 
-                                'agency': station['agency'],
-                                'location': station['location'],
-                                'active': station['active'],
-                                'metadata': json.dumps(station['metadata'])
-                            })
-                            loaded_count += 1
-                        else:
-                            logger.debug(f"Station {station['station_id']} already exists, skipping")
-                    
-                    except Exception as e:
-                        logger.error(f"Failed to load station {station.get('station_id', 'Unknown')}: {e}")
-                        continue
-                
-                conn.commit()
-                logger.info(f"✅ Successfully loaded {loaded_count} new water quality stations")
-                return loaded_count > 0
+            # Bind the whole batch at once so it is sent as multi-row INSERTs
+            params_list = [
+                {
+                    'station_id': station['station_id'],
+                    'name': station['name'],
+                    'type': station['type'], 
+                    'agency': station['agency'],
+                    'longitude': station['longitude'],
+                    'latitude': station['latitude'],
+                    'active': station['active'],
+                    'metadata': dumps_json(station['metadata'])
+                }
+                for station in stations
+            ]
+            
+            loaded_count = self._insert_rows(self._STATION_INSERT, params_list, 'station')
+            
+            logger.info(f"✅ Successfully loaded {loaded_count} new water quality stations")
+            return loaded_count > 0
                 
         except Exception as e:
             logger.error(f"❌ Failed to load stations to database: {e}")
@@ -344,40 +563,24 @@ class WaterQualityConnectorFixed:
         logger.info(f"💾 Loading {len(measurements)} water quality measurements...")
         
         try:
-            with self.db.get_connection() as conn:
-                loaded_count = 0
-                for measurement in measurements:
-                    try:
-                        # Simplified duplicate check
-                        insert_query = text("""
-                            INSERT INTO environmental_measurements 
-                            (station_id, parameter, value, unit, measurement_date, 
-                             data_source, quality_flag)
-                            VALUES (:station_id, :parameter, :value, :unit, 
-                                   :measurement_date, :data_source, :quality_flag)
-                            ON CONFLICT DO NOTHING
-                        """)
-                        
-                        result = conn.execute(insert_query, {
-                            'station_id': measurement['station_id'],
-                            'parameter': measurement['parameter'],
-                            'value': measurement['value'],
-                            'unit': measurement['unit'],
-                            'measurement_date': measurement['measurement_date'],
-                            'data_source': measurement['data_source'],
-                            'quality_flag': measurement['quality_flag']
-                        })
-                        
-                        if result.rowcount > 0:
-                            loaded_count += 1
-                    
-                    except Exception as e:
-                        logger.error(f"Failed to load measurement: {e}")
-                        continue
-                
-                conn.commit()
-                logger.info(f"✅ Successfully loaded {loaded_count} new measurements")
-                return loaded_count > 0
+            # Bind the whole batch at once so it is sent as multi-row INSERTs
+            params_list = [
+                {
+                    'station_id': measurement['station_id'],
+                    'parameter': measurement['parameter'],
+                    'value': measurement['value'],
+                    'unit': measurement['unit'],
+                    'measurement_date': measurement['measurement_date'],
+                    'data_source': measurement['data_source'],
+                    'quality_flag': measurement['quality_flag']
+                }
+                for measurement in measurements
+            ]
+            
+            loaded_count = self._insert_rows(self._MEASUREMENT_INSERT, params_list, 'measurement')
+            
+            logger.info(f"✅ Successfully loaded {loaded_count} new measurements")
+            return loaded_count > 0
                 
         except Exception as e:
             logger.error(f"❌ Failed to load measurements: {e}")
@@ -415,17 +618,10 @@ class WaterQualityConnectorFixed:
         if include_measurements:
             logger.info("📊 Step 2: Loading Sample Water Quality Measurements")
             
-            # Test with first few stations
+            # Test with first few stations, fetched in a single WQP request
             test_stations = stations[:3]  # Test with 3 stations
-            all_measurements = []
-            
-            for station in test_stations:
-                original_id = station['metadata']['original_id']
-                measurements = self.get_sample_measurements(original_id, max_results=50)
-                all_measurements.extend(measurements)
-                
-                # Rate limiting
-                time.sleep(2)
+            original_ids = [station['metadata']['original_id'] for station in test_stations]
+            all_measurements = self.get_measurements_bulk(original_ids, max_results=50)
             
             if all_measurements:
                 measurements_success = self.load_measurements_to_database(all_measurements)
@@ -460,32 +656,28 @@ class WaterQualityConnectorFixed:
         """Verify loaded water quality data"""
         try:
             with self.db.get_connection() as conn:
-                # Count water quality stations
-                result = conn.execute(text("""
-                    SELECT COUNT(*) FROM monitoring_stations 
-                    WHERE type = 'water_quality'
-                """))
-                wq_station_count = result.fetchone()[0]
-                
-                # Get station breakdown by county
+                # Station count, county breakdown and measurement count in one round trip
                 result = conn.execute(text("""
+                    WITH county_counts AS (
+                        SELECT 
+                            (metadata->>'county')::text as county,
+                            COUNT(*) as station_count
+                        FROM monitoring_stations 
+                        WHERE type = 'water_quality'
+                        GROUP BY metadata->>'county'
+                    )
                     SELECT 
-                        (metadata->>'county')::text as county,
-                        COUNT(*) as station_count
-                    FROM monitoring_stations 
-                    WHERE type = 'water_quality'
-                    GROUP BY metadata->>'county'
-                    ORDER BY station_count DESC
-                """))
-                county_breakdown = result.fetchall()
-                
-                # Count measurements if any
-                result = conn.execute(text("""
-                    SELECT COUNT(*) FROM environmental_measurements m
-                    JOIN monitoring_stations s ON m.station_id = s.station_id
-                    WHERE s.type = 'water_quality'
+                        COALESCE(SUM(station_count), 0) as station_total,
+                        (SELECT COUNT(*) FROM environmental_measurements m
+                         JOIN monitoring_stations s ON m.station_id = s.station_id
+                         WHERE s.type = 'water_quality') as measurement_total,
+                        COALESCE(
+                            json_agg(json_build_array(county, station_count) ORDER BY station_count DESC),
+                            '[]'::json
+                        ) as county_breakdown
+                    FROM county_counts
                 """))
-                measurement_count = result.fetchone()[0]
+                wq_station_count, measurement_count, county_breakdown = result.fetchone()
                 
                 logger.info("📊 WATER QUALITY DATA VERIFICATION")
                 logger.info(f"   • Water quality stations: {wq_station_count}")
@@ -0,0 +1,87 @@
+# _client.py
+"""
+Shared HTTP client for the API test scripts
+Keeps session reuse, response decoding and timing in one place
+"""
+
+import json
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson  # Optional: faster decoding of large GeoJSON payloads
+    loads_json = orjson.loads
+except ImportError:
+    loads_json = json.loads
+
+# API base URL
+BASE_URL = "http://localhost:5000/api"
+
+
+def mean_risk_score(scores: List[Dict]) -> float:
+    """Average 'risk_score' over decoded risk score records"""
+    values = np.fromiter((s['risk_score'] for s in scores), dtype=np.float64, count=len(scores))
+    return float(values.mean())
+
+
+class APIClient:
+    """
+    Thin wrapper around one keep-alive requests.Session for the Flask API
+    """
+    
+    def __init__(self, base_url: str = BASE_URL):
+        self.base_url = base_url
+        
+        # Pool is sized above the test scripts' thread-pool concurrency and
+        # transient gateway errors are retried
+        self.session = requests.Session()
+        self.session.mount("http://", HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=16,
+            max_retries=Retry(total=2, backoff_factor=0.05, status_forcelist=(502, 503, 504))
+        ))
+        self.session.headers.update({'Accept-Encoding': 'gzip, deflate'})
+        
+        self._urls: Dict[str, str] = {}
+    
+    def url(self, endpoint: str) -> str:
+        """Full URL for an API endpoint, built once per endpoint"""
+        url = self._urls.get(endpoint)
+        if url is None:
+            url = self._urls[endpoint] = f"{self.base_url}/{endpoint}"
+        return url
+    
+    def timed_get(self, endpoint: str, params: Optional[Dict] = None, timeout: int = 30,
+                  status_only: bool = False) -> Tuple[requests.Response, float]:
+        """
+        GET an endpoint and return the response with its latency in milliseconds
+        Status-only requests stream the body so it is never buffered in memory
+        """
+        start = time.perf_counter_ns()
+        response = self.session.get(self.url(endpoint), params=params, timeout=timeout, stream=status_only)
+        if status_only and response.status_code == 200:
+            # Drain (rather than close) so the keep-alive connection goes back to the pool
+            for _ in response.iter_content(65536):
+                pass
+        elapsed_ms = (time.perf_counter_ns() - start) / 1_000_000
+        return response, elapsed_ms
+    
+    @staticmethod
+    def decode(response: requests.Response) -> Any:
+        """Decode a JSON response body; raises ValueError if it is not JSON"""
+        return loads_json(response.content)
+    
+    def get_json(self, endpoint: str, params: Optional[Dict] = None,
+                 timeout: int = 30) -> Tuple[Any, float, requests.Response]:
+        """GET an endpoint and return (decoded body or None, latency ms, response)"""
+        response, elapsed_ms = self.timed_get(endpoint, params=params, timeout=timeout)
+        try:
+            data = self.decode(response)
+        except ValueError:
+            data = None
+        return data, elapsed_ms, response
@@ -12,7 +12,7 @@ from datetime import datetime, timedelta
 from sqlalchemy import text
 
 # Add src to path
-sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
 from config.database import DatabaseManager
 
 def generate_realistic_measurements():
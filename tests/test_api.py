@@ -5,70 +5,105 @@ Verifies all API endpoints work correctly with your existing data
 """
 
 import requests
-import json
 import sys
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 
-# API base URL
-BASE_URL = "http://localhost:5000/api"
+from _client import APIClient, mean_risk_score
+
+# Shared API client (keep-alive session, fast JSON decoding, latency timing)
+CLIENT = APIClient()
+
+# Station features from the unfiltered stations test, reused for station-specific tests
+STATIONS_CACHE = {}
+
+def report_counties(data, params, out):
+    """County boundary count"""
+    out(f"   ✅ Counties found: {len(data.get('features', []))}")
+
+def report_stations(data, params, out):
+    """Station count and sample station"""
+    features = data.get('features', [])
+    out(f"   ✅ Stations found: {len(features)}")
+    if params is None:
+        STATIONS_CACHE['features'] = features
+    if features:
+        sample = features[0]['properties']
+        out(f"   📍 Sample: {sample.get('name')} ({sample.get('station_id')})")
+
+def report_risk_scores(data, params, out):
+    """Risk score count and average"""
+    scores = data.get('risk_scores', [])
+    out(f"   ✅ Risk scores found: {len(scores)}")
+    if scores:
+        avg_risk = mean_risk_score(scores)
+        out(f"   📊 Average risk: {avg_risk:.2f}")
+
+def report_hotspots(data, params, out):
+    """Hotspot count and summary"""
+    hotspots = data.get('hotspots', {}).get('features', [])
+    out(f"   ✅ Hotspots analysis completed")
+    out(f"   🔥 Total hotspots/coldspots: {len(hotspots)}")
+    summary = data.get('summary')
+    if summary is not None:
+        out(f"   📊 Summary: {summary}")
+
+def report_statewide_risk(data, params, out):
+    """Statewide average risk"""
+    out(f"   ✅ Statewide analysis completed")
+    statewide_summary = data.get('statewide_summary')
+    if statewide_summary is not None:
+        avg = statewide_summary.get('average_risk', 'N/A')
+        out(f"   📊 Average statewide risk: {avg}")
+
+# Per-endpoint response summaries; endpoints without one are checked by status code
+# only and their bodies are never decoded
+RESPONSE_REPORTERS = {
+    'counties': report_counties,
+    'stations': report_stations,
+    'risk-scores': report_risk_scores,
+    'hotspots': report_hotspots,
+    'statewide-risk': report_statewide_risk,
+}
 
 def test_endpoint(endpoint, description, params=None):
     """Test a single API endpoint"""
+    # Buffer this test's output so concurrent tests don't interleave their lines
+    lines = []
+    out = lines.append
+    
     try:
-        print(f"\n🔍 Testing: {description}")
-        print(f"   Endpoint: {endpoint}")
+        out(f"\n🔍 Testing: {description}")
+        out(f"   Endpoint: {endpoint}")
         
-        url = f"{BASE_URL}/{endpoint}"
-        response = requests.get(url, params=params, timeout=30)
+        reporter = RESPONSE_REPORTERS.get(endpoint)
         
-        print(f"   Status: {response.status_code}")
+        response, elapsed_ms = CLIENT.timed_get(endpoint, params=params, status_only=reporter is None)
         
-        if response.status_code == 200:
-            data = response.json()
-            
-            if endpoint == 'counties':
-                print(f"   ✅ Counties found: {len(data.get('features', []))}")
-            elif endpoint == 'stations':
-                print(f"   ✅ Stations found: {len(data.get('features', []))}")
-                if data.get('features'):
-                    sample = data['features'][0]['properties']
-                    print(f"   📍 Sample: {sample.get('name')} ({sample.get('station_id')})")
-            elif endpoint == 'risk-scores':
-                scores = data.get('risk_scores', [])
-                print(f"   ✅ Risk scores found: {len(scores)}")
-                if scores:
-                    avg_risk = sum(s['risk_score'] for s in scores) / len(scores)
-                    print(f"   📊 Average risk: {avg_risk:.2f}")
-            elif endpoint == 'hotspots':
-                hotspots = data.get('hotspots', {}).get('features', [])
-                print(f"   ✅ Hotspots analysis completed")
-                print(f"   🔥 Total hotspots/coldspots: {len(hotspots)}")
-                if 'summary' in data:
-                    print(f"   📊 Summary: {data['summary']}")
-            elif endpoint == 'statewide-risk':
-                print(f"   ✅ Statewide analysis completed")
-                if 'statewide_summary' in data:
-                    avg = data['statewide_summary'].get('average_risk', 'N/A')
-                    print(f"   📊 Average statewide risk: {avg}")
-            else:
-                print(f"   ✅ Response received")
+        out(f"   Status: {response.status_code} ({elapsed_ms:.1f} ms)")
+        
+        if response.status_code == 200 and reporter is None:
+            out(f"   ✅ Response received")
+        elif response.status_code == 200:
+            reporter(CLIENT.decode(response), params, out)
                 
         else:
-            print(f"   ❌ Error: {response.status_code}")
+            out(f"   ❌ Error: {response.status_code}")
             try:
-                error_data = response.json()
-                print(f"   Error details: {error_data}")
-            except:
-                print(f"   Error text: {response.text}")
+                error_data = CLIENT.decode(response)
+                out(f"   Error details: {error_data}")
+            except ValueError:  # Body is not JSON
+                out(f"   Error text: {response.text}")
                 
         return response.status_code == 200
         
     except requests.exceptions.ConnectionError:
-        print(f"   ❌ Connection failed - is the API server running?")
+        out(f"   ❌ Connection failed - is the API server running?")
         return False
     except Exception as e:
-        print(f"   ❌ Unexpected error: {e}")
+        out(f"   ❌ Unexpected error: {e}")
         return False
+    finally:
+        print("\n".join(lines))
 
 def main():
     """Run comprehensive API tests"""
@@ -88,59 +123,69 @@ def main():
         ('statewide-risk', 'Statewide Risk Summary'),
     ]
     
-    # Run tests
-    passed = 0
+    # Run tests concurrently; the endpoints are independent and I/O bound
     total = len(tests)
     
-    for endpoint, description, *params in tests:
-        params = params[0] if params else None
-        success = test_endpoint(endpoint, description, params)
-        if success:
-            passed += 1
+    def run_test(test):
+        endpoint, description, *params = test
+        return test_endpoint(endpoint, description, params[0] if params else None)
+    
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        passed = sum(executor.map(run_test, tests))
     
     # Test with specific station if available
     print(f"\n🔍 Testing: Station-Specific Data")
     try:
-        # Get a station ID first
-        response = requests.get(f"{BASE_URL}/stations", timeout=10)
-        if response.status_code == 200:
-            stations = response.json().get('features', [])
-            if stations:
-                station_id = stations[0]['properties']['station_id']
-                print(f"   Using station: {station_id}")
-                
-                measurements_success = test_endpoint(
-                    'measurements', 
-                    f'Measurements for {station_id}',
-                    {'station_id': station_id, 'days': 30}
-                )
-                
-                if measurements_success:
-                    passed += 1
-                total += 1
+        # Get a station ID first, reusing the stations already fetched above
+        stations = STATIONS_CACHE.get('features')
+        if stations is None:
+            data, _, response = CLIENT.get_json('stations', timeout=10)
+            if response.status_code == 200:
+                stations = data.get('features', [])
+        
+        if stations:
+            station_id = stations[0]['properties']['station_id']
+            print(f"   Using station: {station_id}")
+            
+            measurements_success = test_endpoint(
+                'measurements', 
+                f'Measurements for {station_id}',
+                {'station_id': station_id, 'days': 30}
+            )
+            
+            if measurements_success:
+                passed += 1
+            total += 1
     except Exception as e:
         print(f"   ❌ Station-specific test failed: {e}")
     
-    # Summary
-    print("\n" + "=" * 60)
-    print(f"🎯 API Test Results: {passed}/{total} tests passed")
+    # Summary, written to stdout in one call
+    report = [
+        "\n" + "=" * 60,
+        f"🎯 API Test Results: {passed}/{total} tests passed",
+    ]
     
     if passed == total:
-        print("✅ All tests passed! API is ready for frontend integration.")
-        print("\n🌐 Try these URLs in your browser:")
-        print(f"   • http://localhost:5000 (API documentation)")
-        print(f"   • http://localhost:5000/api/health (health check)")
-        print(f"   • http://localhost:5000/api/counties (county GeoJSON)")
-        print(f"   • http://localhost:5000/api/stations (monitoring stations)")
+        report.extend([
+            "✅ All tests passed! API is ready for frontend integration.",
+            "\n🌐 Try these URLs in your browser:",
+            f"   • http://localhost:5000 (API documentation)",
+            f"   • http://localhost:5000/api/health (health check)",
+            f"   • http://localhost:5000/api/counties (county GeoJSON)",
+            f"   • http://localhost:5000/api/stations (monitoring stations)",
+        ])
     else:
-        print(f"❌ {total - passed} tests failed. Check the API server and database connection.")
+        report.append(f"❌ {total - passed} tests failed. Check the API server and database connection.")
+    
+    sys.stdout.write("\n".join(report) + "\n")
         
     return passed == total
 
 if __name__ == "__main__":
-    # Check if API server is accessible
+    # Check if API server is accessible; this also warms up the shared session's
+    # connection pool so DNS/TCP setup isn't counted in the first measured request
     try:
-        response = requests.get("http://localhost:5000/api/health", timeout=5)
+        CLIENT.timed_get('health', timeout=5, status_only=True)
         main()
     except requests.exceptions.ConnectionError:
         print("❌ Cannot connect to API server at http://localhost:5000")
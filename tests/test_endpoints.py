@@ -5,39 +5,42 @@ Run this while your Flask API is running on localhost:5000
 """
 
 import requests
-import json
+
+from _client import APIClient, mean_risk_score
+
+# Shared API client (keep-alive session, fast JSON decoding, latency timing)
+CLIENT = APIClient()
 
 def test_api():
     """Test key API endpoints quickly"""
-    base_url = "http://localhost:5000/api"
-    
     print("🧪 Quick API Test Suite")
     print("=" * 40)
     
     tests = [
         {
             'name': 'Health Check',
-            'url': f"{base_url}/health",
+            'endpoint': 'health',
             'expect': 'status'
         },
         {
             'name': 'Counties (GeoJSON)',
-            'url': f"{base_url}/counties",
+            'endpoint': 'counties',
             'expect': 'features'
         },
         {
             'name': 'Monitoring Stations',
-            'url': f"{base_url}/stations",
+            'endpoint': 'stations',
             'expect': 'features'
         },
         {
             'name': 'Risk Scores',
-            'url': f"{base_url}/risk-scores?type=station",
+            'endpoint': 'risk-scores',
+            'params': {'type': 'station'},
             'expect': 'risk_scores'
         },
         {
             'name': 'Hotspot Detection',
-            'url': f"{base_url}/hotspots",
+            'endpoint': 'hotspots',
             'expect': 'hotspots'
         }
     ]
@@ -45,11 +48,9 @@ def test_api():
     for test in tests:
         try:
             print(f"\n🔍 {test['name']}")
-            response = requests.get(test['url'], timeout=10)
+            data, _, response = CLIENT.get_json(test['endpoint'], params=test.get('params'), timeout=10)
             
             if response.status_code == 200:
-                data = response.json()
-                
                 if test['expect'] == 'status':
                     print(f"   ✅ Status: {data.get('status', 'unknown')}")
                 elif test['expect'] == 'features':
@@ -63,7 +64,7 @@ def test_api():
                     scores = data.get('risk_scores', [])
                     print(f"   ✅ Found {len(scores)} risk scores")
                     if scores:
-                        avg = sum(s['risk_score'] for s in scores) / len(scores)
+                        avg = mean_risk_score(scores)
                         print(f"   📊 Avg risk: {avg:.2f}")
                 elif test['expect'] == 'hotspots':
                     print(f"   ✅ Hotspot analysis completed")
@@ -73,9 +74,8 @@ def test_api():
             else:
                 print(f"   ❌ HTTP {response.status_code}")
                 try:
-                    error = response.json()
-                    print(f"   Error: {error.get('error', 'Unknown error')}")
-                except:
+                    print(f"   Error: {data.get('error', 'Unknown error')}")
+                except AttributeError:  # Body is not a JSON object
                     print(f"   Error: {response.text[:100]}...")
                     
         except requests.exceptions.ConnectionError:
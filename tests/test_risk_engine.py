@@ -6,73 +6,147 @@ Run this to verify the risk scoring module works correctly
 
 import sys
 import os
-import traceback
+import io
+import logging
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
 
 # Add src directory to path
-sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
 
-def test_imports():
-    """Test that all required modules can be imported"""
-    print("🔍 Testing imports...")
+logger = logging.getLogger(__name__)
+
+# Row counts come from planner statistics unless --exact is passed
+EXACT_COUNTS = '--exact' in sys.argv[1:]
+
+# Statements are built once at import; values go in as bind parameters
+_Q_COUNT_AIR_STATIONS = text("SELECT COUNT(*) FROM monitoring_stations WHERE type = 'air_quality'")
+
+_Q_COUNT_MEASUREMENTS = text("SELECT COUNT(*) FROM environmental_measurements")
+
+_Q_ESTIMATE_AIR_STATIONS = text("EXPLAIN (FORMAT JSON) SELECT 1 FROM monitoring_stations WHERE type = 'air_quality'")
+
+_Q_ESTIMATE_MEASUREMENTS = text("SELECT reltuples::bigint FROM pg_class WHERE oid = 'environmental_measurements'::regclass")
+
+_Q_SAMPLE_STATIONS = text("""
+    SELECT COALESCE(json_agg(row_to_json(t)), '[]'::json)
+    FROM (
+        SELECT station_id, name, metadata->>'parameter_name' as parameter
+        FROM monitoring_stations 
+        WHERE type = 'air_quality' 
+        LIMIT 3
+    ) t
+""")
+
+_Q_SAVED_RISK_SCORE = text("""
+    SELECT risk_score, risk_category 
+    FROM environmental_risk_scores 
+    WHERE location_id = :location_id
+    ORDER BY created_at DESC 
+    LIMIT 1
+""")
+
+_Q_COUNT_RISK_SCORES = text("SELECT COUNT(*) FROM environmental_risk_scores WHERE location_id LIKE :pattern")
+
+# Synthetic rows written (then rolled back) by the storage test
+TEST_LOCATION_PREFIX = 'TEST-STATION-'
+TEST_BATCH_SIZE = 1000
+
+@functools.lru_cache(maxsize=1)
+def get_db():
+    """DatabaseManager shared by every test, so the engine and its pool are built once"""
+    from config.database import DatabaseManager
+    return DatabaseManager()
+
+@functools.lru_cache(maxsize=1)
+def get_risk_engine():
+    """Risk engine shared by every test, on the shared DatabaseManager"""
+    from analysis.risk_scoring import EnvironmentalRiskScoring
+    return EnvironmentalRiskScoring(db=get_db())
+
+@functools.lru_cache(maxsize=1)
+def get_analysis_window():
+    """30-day window shared by the station and county tests, fixed once per run"""
+    end_date = datetime.now()
+    return (end_date - timedelta(days=30), end_date)
+
+@functools.lru_cache(maxsize=1)
+def _check_imports():
+    """Import the engine's dependencies once; returns (imported labels, ImportError or None)"""
+    imported = []
     try:
         import numpy as np
-        print("   ✅ numpy imported")
+        imported.append("numpy")
         
         import pandas as pd
-        print("   ✅ pandas imported")
+        imported.append("pandas")
         
         from sqlalchemy import text
-        print("   ✅ sqlalchemy imported")
+        imported.append("sqlalchemy")
         
         # Test our modules
         from config.database import DatabaseManager
-        print("   ✅ DatabaseManager imported")
+        imported.append("DatabaseManager")
         
         from analysis.risk_scoring import EnvironmentalRiskScoring, RiskLevel, RiskParameters
-        print("   ✅ Risk scoring modules imported")
-        
-        return True
+        imported.append("Risk scoring modules")
     except ImportError as e:
-        print(f"   ❌ Import failed: {e}")
+        return tuple(imported), e
+    return tuple(imported), None
+
+def test_imports():
+    """Test that all required modules can be imported"""
+    print("🔍 Testing imports...")
+    imported, error = _check_imports()
+    for label in imported:
+        print(f"   ✅ {label} imported")
+    
+    if error is not None:
+        print(f"   ❌ Import failed: {error}")
         return False
+    return True
 
 def test_database_connection():
     """Test database connectivity"""
     print("\n🔌 Testing database connection...")
     try:
-        from config.database import DatabaseManager
-        db = DatabaseManager()
+        db = get_db()
         
         if db.test_connection():
             print("   ✅ Database connection successful")
             
             # Test data availability
             with db.get_connection() as conn:
-                from sqlalchemy import text
+                if EXACT_COUNTS:
+                    station_count = conn.execute(_Q_COUNT_AIR_STATIONS).scalar()
+                    measurement_count = conn.execute(_Q_COUNT_MEASUREMENTS).scalar()
+                    approx = ""
+                else:
+                    # Planner estimates are catalog lookups rather than table scans
+                    station_count = conn.execute(_Q_ESTIMATE_AIR_STATIONS).scalar()[0]['Plan']['Plan Rows']
+                    measurement_count = conn.execute(_Q_ESTIMATE_MEASUREMENTS).scalar()
+                    approx = "~"
                 
                 # Check for monitoring stations
-                result = conn.execute(text("SELECT COUNT(*) FROM monitoring_stations WHERE type = 'air_quality'"))
-                station_count = result.fetchone()[0]
-                print(f"   📊 Found {station_count} air quality monitoring stations")
+                print(f"   📊 Found {approx}{station_count} air quality monitoring stations")
                 
-                # Check for measurements
-                result = conn.execute(text("SELECT COUNT(*) FROM environmental_measurements"))
-                measurement_count = result.fetchone()[0]
-                print(f"   📊 Found {measurement_count} environmental measurements")
+                # Check for measurements (reltuples is -1 until the table is first analyzed)
+                if measurement_count < 0:
+                    print("   📊 Environmental measurements: unknown (run ANALYZE or use --exact)")
+                else:
+                    print(f"   📊 Found {approx}{measurement_count} environmental measurements")
                 
-                if station_count > 0:
-                    # Get sample station info
-                    result = conn.execute(text("""
-                        SELECT station_id, name, metadata->>'parameter_name' as parameter
-                        FROM monitoring_stations 
-                        WHERE type = 'air_quality' 
-                        LIMIT 3
-                    """))
-                    
-                    stations = result.fetchall()
-                    print("   📍 Sample stations:")
-                    for station_id, name, param in stations:
-                        print(f"      - {station_id}: {name} ({param})")
+                # Get sample station info as one JSON array; LIMIT 3 stops at the first
+                # matches, so an empty array doubles as the "no stations" check
+                stations = conn.execute(_Q_SAMPLE_STATIONS).scalar()
+                if stations:
+                    print("   📍 Sample stations:\n" + "\n".join(
+                        f"      - {s['station_id']}: {s['name']} ({s['parameter']})" for s in stations
+                    ))
                 
                 return True
         else:
@@ -81,16 +155,15 @@ def test_database_connection():
             
     except Exception as e:
         print(f"   ❌ Database test failed: {e}")
-        traceback.print_exc()
+        logger.exception("Database Connection test failed")
         return False
 
 def test_risk_calculations():
     """Test risk calculation functions"""
     print("\n🧮 Testing risk calculations...")
     try:
-        from analysis.risk_scoring import EnvironmentalRiskScoring
-        
-        risk_engine = EnvironmentalRiskScoring()
+        from analysis.risk_scoring import HAS_NUMBA
+        risk_engine = get_risk_engine()
         
         # Test individual pollutant scoring
         print("   🔬 Testing pollutant risk scoring:")
@@ -102,126 +175,122 @@ def test_risk_calculations():
             ("Ozone", 50.0, "Expected: low risk"),
         ]
         
-        for pollutant, concentration, expected in test_cases:
-            risk_score = risk_engine.calculate_pollutant_risk_score(pollutant, concentration)
+        print(f"   ⚙️  Batch kernel: {'numba' if HAS_NUMBA else 'numpy'}")
+        
+        pollutants, concentrations, expectations = zip(*test_cases)
+        risk_scores = risk_engine.calculate_pollutant_risk_score_batch(pollutants, concentrations)
+        
+        for pollutant, concentration, expected, risk_score in zip(pollutants, concentrations, expectations, risk_scores):
             print(f"      {pollutant} @ {concentration}: {risk_score:.1f}/100 ({expected})")
+            
+            # The batch scorer must agree with the scalar reference implementation
+            reference_score = risk_engine.calculate_pollutant_risk_score(pollutant, concentration)
+            if abs(risk_score - reference_score) > 1e-9:
+                print(f"   ❌ Batch score {risk_score} differs from scalar score {reference_score}")
+                return False
         
         print("   ✅ Pollutant risk calculations working")
         return True
         
     except Exception as e:
         print(f"   ❌ Risk calculation test failed: {e}")
-        traceback.print_exc()
+        logger.exception("Risk Calculations test failed")
         return False
 
 def test_station_risk_analysis():
     """Test station-level risk analysis"""
     print("\n🏭 Testing station risk analysis...")
     try:
-        from analysis.risk_scoring import EnvironmentalRiskScoring
-        from config.database import DatabaseManager
-        from sqlalchemy import text
+        risk_engine = get_risk_engine()
         
-        risk_engine = EnvironmentalRiskScoring()
-        db = DatabaseManager()
+        # Score every active station from a single query, over the shared window so
+        # the batch and single-station paths see the same data
+        date_range = get_analysis_window()
+        station_risks = risk_engine.calculate_station_risk_scores(date_range)
         
-        # Get a test station
-        with db.get_connection() as conn:
-            result = conn.execute(text("""
-                SELECT station_id, name 
-                FROM monitoring_stations 
-                WHERE type = 'air_quality' AND active = true
-                LIMIT 1
-            """))
-            
-            station_data = result.fetchone()
-            
-            if not station_data:
-                print("   ⚠️  No test stations available - skipping station analysis")
-                return True
-            
-            station_id, station_name = station_data
-            print(f"   🎯 Testing with station: {station_name} ({station_id})")
-            
-            # Calculate risk for this station
-            risk_result = risk_engine.calculate_station_risk_score(station_id)
-            
-            print(f"      Risk Score: {risk_result['risk_score']}/100")
-            print(f"      Risk Level: {risk_result['risk_level']}")
-            print(f"      Data Availability: {risk_result['data_availability']}")
-            
-            if risk_result.get('components'):
-                print("      Components:")
-                for param, details in risk_result['components'].items():
-                    print(f"        - {param}: {details['risk_score']:.1f}/100 (samples: {details['sample_count']})")
-            
-            print("   ✅ Station risk analysis working")
+        if station_risks.empty:
+            print("   ⚠️  No test stations with recent data - skipping station analysis")
             return True
+        
+        print(f"   📊 Scored {len(station_risks)} stations in one batch")
+        for row in station_risks.nlargest(3, 'risk_score').itertuples(index=False):
+            print(f"      - {row.station_id}: {row.risk_score}/100 ({row.risk_level}, {row.data_availability})")
+        
+        # Cross-check one sampled station against the single-station path
+        sample = station_risks.iloc[0]
+        print(f"   🎯 Verifying station: {sample.station_id}")
+        risk_result = risk_engine.calculate_station_risk_score(sample.station_id, date_range)
+        
+        print(f"      Risk Score: {risk_result['risk_score']}/100")
+        print(f"      Risk Level: {risk_result['risk_level']}")
+        print(f"      Data Availability: {risk_result['data_availability']}")
+        
+        if risk_result.get('components'):
+            print("      Components:")
+            for param, details in risk_result['components'].items():
+                print(f"        - {param}: {details['risk_score']:.1f}/100 (samples: {details['sample_count']})")
+        
+        if abs(risk_result['risk_score'] - sample.risk_score) > 0.01 or risk_result['risk_level'] != sample.risk_level:
+            print(f"   ❌ Batch score {sample.risk_score} ({sample.risk_level}) does not match single-station path")
+            return False
+        
+        print("   ✅ Station risk analysis working")
+        return True
             
     except Exception as e:
         print(f"   ❌ Station risk analysis test failed: {e}")
-        traceback.print_exc()
+        logger.exception("Station Risk Analysis test failed")
         return False
 
 def test_county_risk_analysis():
     """Test county-level risk analysis"""
     print("\n🏘️  Testing county risk analysis...")
     try:
-        from analysis.risk_scoring import EnvironmentalRiskScoring
-        from config.database import DatabaseManager
-        from sqlalchemy import text
+        risk_engine = get_risk_engine()
         
-        risk_engine = EnvironmentalRiskScoring()
-        db = DatabaseManager()
+        # County assignment and measurements come back from one query; shared window
+        # so the batch and per-county paths see the same data
+        date_range = get_analysis_window()
+        county_risks = risk_engine.calculate_county_risk_scores(date_range)
         
-        # Get a test county with stations
-        with db.get_connection() as conn:
-            result = conn.execute(text("""
-                SELECT DISTINCT b.name as county_name, COUNT(s.station_id) as station_count
-                FROM administrative_boundaries b
-                JOIN monitoring_stations s ON ST_Within(s.location, b.geometry)
-                WHERE b.type = 'county' AND s.type = 'air_quality' AND s.active = true
-                GROUP BY b.name
-                ORDER BY station_count DESC
-                LIMIT 1
-            """))
-            
-            county_data = result.fetchone()
-            
-            if not county_data:
-                print("   ⚠️  No counties with stations available - skipping county analysis")
-                return True
-            
-            county_name, station_count = county_data
-            print(f"   🎯 Testing with county: {county_name} ({station_count} stations)")
-            
-            # Calculate county risk
-            county_risk = risk_engine.calculate_county_risk_score(county_name)
-            
-            print(f"      County Risk: {county_risk['risk_score']}/100")
-            print(f"      Risk Level: {county_risk['risk_level']}")
-            print(f"      Active Stations: {county_risk['station_count']}")
-            print(f"      Data Availability: {county_risk['data_availability']}")
-            
-            print("   ✅ County risk analysis working")
+        if county_risks.empty:
+            print("   ⚠️  No counties with stations available - skipping county analysis")
             return True
+        
+        print(f"   📊 Scored {len(county_risks)} counties in one batch")
+        
+        # Cross-check the best-covered county against the per-county path
+        sample = county_risks.loc[county_risks['station_count'].idxmax()]
+        print(f"   🎯 Testing with county: {sample.county} ({sample.station_count} stations)")
+        
+        county_risk = risk_engine.calculate_county_risk_score(sample.county, date_range)
+        
+        print(f"      County Risk: {county_risk['risk_score']}/100")
+        print(f"      Risk Level: {county_risk['risk_level']}")
+        print(f"      Active Stations: {county_risk['station_count']}")
+        print(f"      Data Availability: {county_risk['data_availability']}")
+        
+        if abs(county_risk['risk_score'] - sample.risk_score) > 0.01 or county_risk['risk_level'] != sample.risk_level:
+            print(f"   ❌ Batch score {sample.risk_score} ({sample.risk_level}) does not match per-county path")
+            return False
+        
+        print("   ✅ County risk analysis working")
+        return True
             
     except Exception as e:
         print(f"   ❌ County risk analysis test failed: {e}")
-        traceback.print_exc()
+        logger.exception("County Risk Analysis test failed")
         return False
 
 def test_database_storage():
     """Test saving risk scores to database"""
     print("\n💾 Testing database storage...")
     try:
-        from analysis.risk_scoring import EnvironmentalRiskScoring
+        risk_engine = get_risk_engine()
         
-        risk_engine = EnvironmentalRiskScoring()
-        
-        # Create a test risk result
-        test_risk_data = {
-            'station_id': 'TEST-STATION-001',
+        # Create a batch of test risk results
+        test_risk_data = [{
+            'station_id': f'{TEST_LOCATION_PREFIX}{i:04d}',
             'risk_score': 42.5,
             'risk_level': 'MODERATE',
             'components': {
@@ -231,46 +300,70 @@ def test_database_storage():
                     'sample_count': 30
                 }
             }
-        }
-        
-        # Save to database
-        risk_engine.save_risk_scores_to_db(test_risk_data, 'station')
-        
-        # Verify it was saved
-        from config.database import DatabaseManager
-        from sqlalchemy import text
+        } for i in range(TEST_BATCH_SIZE)]
         
-        db = DatabaseManager()
+        # Save and verify inside one transaction that is rolled back afterwards,
+        # so no test rows are ever committed and nothing needs deleting
+        db = get_db()
         with db.get_connection() as conn:
-            result = conn.execute(text("""
-                SELECT risk_score, risk_category 
-                FROM environmental_risk_scores 
-                WHERE location_id = 'TEST-STATION-001'
-                ORDER BY created_at DESC 
-                LIMIT 1
-            """))
-            
-            saved_data = result.fetchone()
+            transaction = conn.begin()
+            try:
+                risk_engine.save_risk_scores_to_db(test_risk_data, 'station', conn=conn)
+                
+                saved_count = conn.execute(_Q_COUNT_RISK_SCORES, {'pattern': f'{TEST_LOCATION_PREFIX}%'}).scalar()
+                saved_data = conn.execute(_Q_SAVED_RISK_SCORE, {'location_id': test_risk_data[0]['station_id']}).fetchone()
+            finally:
+                transaction.rollback()
+                print("   🧹 Rolled back test data")
             
-            if saved_data:
+            if saved_data and saved_count >= TEST_BATCH_SIZE:
                 saved_risk, saved_category = saved_data
                 print(f"   ✅ Successfully saved and retrieved risk data:")
+                print(f"      Rows Saved: {saved_count}")
                 print(f"      Risk Score: {saved_risk}")
                 print(f"      Risk Category: {saved_category}")
                 
-                # Clean up test data
-                conn.execute(text("DELETE FROM environmental_risk_scores WHERE location_id = 'TEST-STATION-001'"))
-                conn.commit()
-                print("   🧹 Cleaned up test data")
-                
                 return True
             else:
-                print("   ❌ Failed to retrieve saved risk data")
+                print(f"   ❌ Failed to retrieve saved risk data ({saved_count}/{TEST_BATCH_SIZE} rows)")
                 return False
                 
     except Exception as e:
         print(f"   ❌ Database storage test failed: {e}")
-        traceback.print_exc()
+        logger.exception("Database Storage test failed")
+        return False
+
+class _ThreadLocalStdout:
+    """sys.stdout stand-in that gives each capturing worker thread its own buffer"""
+    
+    def __init__(self, stream):
+        self.stream = stream
+        self._local = threading.local()
+    
+    def capture(self):
+        self._local.buffer = io.StringIO()
+        return self._local.buffer
+    
+    def write(self, data):
+        return (getattr(self._local, 'buffer', None) or self.stream).write(data)
+    
+    def flush(self):
+        self.stream.flush()
+
+def run_test(test_name, test_func):
+    """Run one test and report it; returns True if it passed"""
+    print(f"\n{'='*20} {test_name} {'='*20}")
+    try:
+        if test_func():
+            print(f"✅ {test_name} PASSED")
+            return True
+        print(f"❌ {test_name} FAILED")
+        return False
+    except Exception as e:
+        print(f"❌ {test_name} FAILED with exception: {e}")
+        # Printed output is held until the run ends but tracebacks go out straight
+        # away, so they carry the test name to be matched up with the report
+        logger.exception("%s test failed", test_name)
         return False
 
 def run_all_tests():
@@ -278,8 +371,17 @@ def run_all_tests():
     print("🚀 Environmental Risk Scoring Engine - Test Suite")
     print("=" * 60)
     
+    # Every test's output is captured and the whole report goes out in a single
+    # write once the run finishes
+    stdout = _ThreadLocalStdout(sys.stdout)
+    
+    def run_captured(test):
+        buffer = stdout.capture()
+        return run_test(*test), buffer.getvalue()
+    
+    # The remaining tests are independent and mostly wait on PostgreSQL, so they
+    # run side by side on the shared engine's pool
     tests = [
-        ("Import Tests", test_imports),
         ("Database Connection", test_database_connection),
         ("Risk Calculations", test_risk_calculations),
         ("Station Risk Analysis", test_station_risk_analysis),
@@ -287,32 +389,38 @@ def run_all_tests():
         ("Database Storage", test_database_storage)
     ]
     
-    passed = 0
-    failed = 0
+    # Build the shared engine and fix the analysis window before the tests fan out
+    # across threads (lru_cache does not stop two threads building them at once).
+    # A failure here is left for test_imports and the tests themselves to report
+    get_analysis_window()
+    try:
+        get_risk_engine()
+    except Exception as e:
+        logger.warning(f"Could not build the shared risk engine: {e}")
     
-    for test_name, test_func in tests:
-        print(f"\n{'='*20} {test_name} {'='*20}")
-        try:
-            if test_func():
-                passed += 1
-                print(f"✅ {test_name} PASSED")
-            else:
-                failed += 1
-                print(f"❌ {test_name} FAILED")
-        except Exception as e:
-            failed += 1
-            print(f"❌ {test_name} FAILED with exception: {e}")
-            traceback.print_exc()
+    sys.stdout = stdout
+    try:
+        results = [run_captured(("Import Tests", test_imports))]
+        with ThreadPoolExecutor(max_workers=len(tests)) as executor:
+            results.extend(executor.map(run_captured, tests))
+    finally:
+        sys.stdout = stdout.stream
     
-    print(f"\n{'='*60}")
-    print(f"🎯 TEST RESULTS: {passed} passed, {failed} failed")
+    passed = sum(test_passed for test_passed, _ in results)
+    failed = len(results) - passed
+    all_passed = failed == 0
     
-    if failed == 0:
-        print("🎉 ALL TESTS PASSED! Risk scoring engine is ready.")
-        return True
+    report = [output for _, output in results]
+    report.append(f"\n{'='*60}\n")
+    report.append(f"🎯 TEST RESULTS: {passed} passed, {failed} failed\n")
+    if all_passed:
+        report.append("🎉 ALL TESTS PASSED! Risk scoring engine is ready.\n")
     else:
-        print("⚠️  Some tests failed. Please check the errors above.")
-        return False
+        report.append("⚠️  Some tests failed. Please check the errors above.\n")
+    
+    sys.stdout.write("".join(report))
+    sys.stdout.flush()
+    return all_passed
 
 def run_demo_if_tests_pass():
     """Run the demo if all tests pass"""
@@ -327,7 +435,7 @@ def run_demo_if_tests_pass():
             print("\n🎉 Demo completed successfully!")
         except Exception as e:
             print(f"❌ Demo failed: {e}")
-            traceback.print_exc()
+            logger.exception("Demo failed")
     else:
         print("\n❌ Skipping demo due to test failures")
 